@@ -11,34 +11,139 @@ from gi.repository import Gtk, Gdk, GLib, Pango
 import serial
 import serial.tools.list_ports
 import threading
-import queue
+import collections
 import os
 import json
+import bisect
+import codecs
+import time
+
+try:
+    import orjson  # Optional, much faster history (de)serialization
+except ImportError:
+    orjson = None
 
 HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "serial_command_history.json")
 MAX_HISTORY_PER_CONNECTION = 500
+HISTORY_SAVE_DELAY = 3  # Seconds to coalesce history changes before writing
+# History is written compactly unless this environment variable is set
+PRETTY_HISTORY = bool(os.environ.get("SERIAL_MONITOR_PRETTY_HISTORY"))
+
+# Serial reads are coalesced into chunks of at most this many bytes,
+# waiting this long (seconds) for a burst to finish arriving
+READ_CHUNK_MAX = 16 * 1024
+READ_AGGREGATE_DELAY = 0.02
+
+# Oldest console lines are dropped beyond this count
+MAX_CONSOLE_LINES = 5000
+
+# Console appearance, built once and shared by every tab
+CONSOLE_FONT = Pango.FontDescription("Monospace 10")
+CONSOLE_BG = Gdk.color_parse("#000000")
+CONSOLE_FG = Gdk.color_parse("#FFFFFF")
+
+# Built-in UARTs that are hidden from the port list
+EXCLUDED_PORT_PREFIXES = ("/dev/ttyS",)
+
+
+def list_serial_ports():
+    """Return a sorted tuple of available serial port devices"""
+    ports = serial.tools.list_ports.comports()
+    return tuple(sorted(p.device for p in ports if not p.device.startswith(EXCLUDED_PORT_PREFIXES)))
+
+
+def decode_with_hex_fallback(data, decoder):
+    """Decode serial bytes, showing complete lines that are not valid UTF-8 as hex.
+    The unfinished last line goes through the incremental decoder so a character
+    split across reads is completed by the next chunk."""
+    end = data.rfind(b"\n") + 1
+    parts = []
+    for line in data[:end].split(b"\n")[:-1]:
+        text = line.decode('utf-8', errors='replace')
+        parts.append(f"[HEX] {line.hex()}\n" if "\ufffd" in text else text + "\n")
+
+    tail = decoder.decode(data[end:])
+    if "\ufffd" in tail:
+        decoder.reset()
+        tail = f"[HEX] {data[end:].hex()}\n"
+    parts.append(tail)
+    return "".join(parts)
+
+
+def create_console_tag_table():
+    """Create the color tags used by every console buffer"""
+    tag_table = Gtk.TextTagTable()
+    tag_table.add(Gtk.TextTag(name="output", foreground="#00FF00"))  # Green
+    tag_table.add(Gtk.TextTag(name="input", foreground="#00BFFF"))   # Light blue
+    tag_table.add(Gtk.TextTag(name="error", foreground="#FF4500"))   # Orange-red
+    tag_table.add(Gtk.TextTag(name="info", foreground="#FFD700"))    # Gold
+    return tag_table
+
+
+CONSOLE_TAG_TABLE = create_console_tag_table()
+
+
+def json_dumps(obj, pretty=False):
+    """Serialize obj to UTF-8 JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def json_loads(data):
+    """Parse JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def load_all_history():
     """Load command history for all connections from disk"""
     if os.path.exists(HISTORY_FILE):
         try:
-            with open(HISTORY_FILE, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
+            with open(HISTORY_FILE, 'rb') as f:
+                return json_loads(f.read())
+        except (json.JSONDecodeError, UnicodeDecodeError, IOError):
             pass
     return {}
 
 
 def save_all_history(history):
     """Save command history for all connections to disk"""
+    # Write to a temporary file and swap it in so a crash never leaves a partial file
+    tmp_file = HISTORY_FILE + ".tmp"
     try:
-        with open(HISTORY_FILE, 'w') as f:
-            json.dump(history, f, indent=2)
+        with open(tmp_file, 'wb') as f:
+            f.write(json_dumps(history, PRETTY_HISTORY))
+        os.replace(tmp_file, HISTORY_FILE)
     except IOError:
         pass
 
 
+# In-memory command history, loaded once and flushed to disk lazily
+HISTORY = load_all_history()
+_history_dirty = False
+
+
+def schedule_history_save():
+    """Mark the history as modified and schedule a deferred write to disk"""
+    global _history_dirty
+    if not _history_dirty:
+        _history_dirty = True
+        GLib.timeout_add_seconds(HISTORY_SAVE_DELAY, flush_history)
+
+
+def flush_history():
+    """Write the in-memory history to disk if it has unsaved changes"""
+    global _history_dirty
+    if _history_dirty:
+        save_all_history(HISTORY)
+        _history_dirty = False
+    return False  # One-shot timer
+
+
 class SerialTab:
     """Represents a single serial connection tab"""
 
@@ -49,7 +154,14 @@ class SerialTab:
         self.serial_port = None
         self.is_connected = False
         self.read_thread = None
-        self.message_queue = queue.Queue()
+        self.message_queue = collections.deque()  # Single producer/consumer, no lock needed
+        self._scroll_pending = False
+
+        # Wake the main loop through a pipe whenever messages are queued
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._wake_source = GLib.io_add_watch(self._wake_r, GLib.PRIORITY_DEFAULT, GLib.IO_IN, self._on_wake)
 
         # Command history per connection
         self.connection_name = ""
@@ -73,9 +185,6 @@ class SerialTab:
         # Create UI elements
         self.create_widgets()
 
-        # Start queue processing
-        GLib.timeout_add(100, self.process_queue)
-
     def create_widgets(self):
         # Connection name row
         name_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
@@ -101,6 +210,8 @@ class SerialTab:
         self.port_combo = Gtk.ComboBoxText()
         self.port_combo.set_size_request(150, -1)
         control_box.pack_start(self.port_combo, False, False, 0)
+        self.combo_ports = []  # Sorted mirror of the port dropdown entries
+        self.ports_stale = False  # Port list changed while connected
         self.refresh_ports()
 
         # Baudrate selection
@@ -133,32 +244,22 @@ class SerialTab:
         scrolled.set_hexpand(True)
         self.box.pack_start(scrolled, True, True, 0)
 
-        # Text view for console
-        self.console = Gtk.TextView()
+        # Text view for console, backed by a buffer using the shared tag table
+        self.text_buffer = Gtk.TextBuffer(tag_table=CONSOLE_TAG_TABLE)
+        self.console = Gtk.TextView.new_with_buffer(self.text_buffer)
         self.console.set_editable(False)
         self.console.set_cursor_visible(False)
         self.console.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
 
         # Set monospace font and dark background
-        font_desc = Pango.FontDescription("Monospace 10")
-        self.console.modify_font(font_desc)
-
-        # Set colors
-        bg_color = Gdk.color_parse("#000000")
-        fg_color = Gdk.color_parse("#FFFFFF")
-        self.console.modify_bg(Gtk.StateType.NORMAL, bg_color)
-        self.console.modify_fg(Gtk.StateType.NORMAL, fg_color)
+        self.console.modify_font(CONSOLE_FONT)
+        self.console.modify_bg(Gtk.StateType.NORMAL, CONSOLE_BG)
+        self.console.modify_fg(Gtk.StateType.NORMAL, CONSOLE_FG)
 
         scrolled.add(self.console)
 
-        # Create text buffer and tags
-        self.text_buffer = self.console.get_buffer()
-
-        # Create tags for colors
-        self.text_buffer.create_tag("output", foreground="#00FF00")  # Green
-        self.text_buffer.create_tag("input", foreground="#00BFFF")   # Light blue
-        self.text_buffer.create_tag("error", foreground="#FF4500")   # Orange-red
-        self.text_buffer.create_tag("info", foreground="#FFD700")    # Gold
+        # Right-gravity mark that always sits at the end of the buffer
+        self._end_mark = self.text_buffer.create_mark("serial_end", self.text_buffer.get_end_iter(), False)
 
         # Input area
         input_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
@@ -168,6 +269,18 @@ class SerialTab:
 
         self.input_entry = Gtk.Entry()
         self.input_entry.set_hexpand(True)
+
+        # Popup completion from this connection's history. Set before the
+        # key handler so Up/Down go to the completion popup while it is shown.
+        # No inline completion: it would put a selected suffix into the entry
+        # that send_data() would send along with the typed command.
+        self.history_store = Gtk.ListStore(str)
+        self.history_completion_set = set()
+        completion = Gtk.EntryCompletion()
+        completion.set_model(self.history_store)
+        completion.set_text_column(0)
+        self.input_entry.set_completion(completion)
+
         self.input_entry.connect("activate", lambda w: self.send_data())
         self.input_entry.connect("key-press-event", self.on_input_key_press)
         input_box.pack_start(self.input_entry, True, True, 0)
@@ -176,6 +289,10 @@ class SerialTab:
         send_btn.connect("clicked", lambda w: self.send_data())
         input_box.pack_start(send_btn, False, False, 0)
 
+        # Optional uppercase conversion of outgoing commands
+        self.uppercase_check = Gtk.CheckButton(label="UPPERCASE")
+        input_box.pack_start(self.uppercase_check, False, False, 0)
+
         clear_btn = Gtk.Button(label="Clear")
         clear_btn.connect("clicked", lambda w: self.clear_console())
         input_box.pack_start(clear_btn, False, False, 0)
@@ -183,8 +300,7 @@ class SerialTab:
     def populate_connection_names(self):
         """Populate the connection name dropdown with existing names from history"""
         self.name_combo.remove_all()
-        all_history = load_all_history()
-        for name in sorted(all_history.keys()):
+        for name in self.parent.connection_names:
             self.name_combo.append_text(name)
 
     def on_name_combo_selected(self, combo):
@@ -200,49 +316,67 @@ class SerialTab:
         if new_name == old_name:
             return
 
-        all_history = load_all_history()
-
         if old_name and new_name and old_name != new_name:
             # Rename: migrate history from old name to new name
-            old_history = all_history.pop(old_name, [])
+            old_history = HISTORY.pop(old_name, [])
             # Merge: existing new_name history (if any) + old history
-            existing = all_history.get(new_name, [])
+            existing = HISTORY.get(new_name, [])
             merged = existing + old_history
             if len(merged) > MAX_HISTORY_PER_CONNECTION:
                 merged = merged[-MAX_HISTORY_PER_CONNECTION:]
-            all_history[new_name] = merged
-            save_all_history(all_history)
-            self.command_history = merged
+            HISTORY[new_name] = merged
+            schedule_history_save()
+            self.command_history = list(merged)
         elif new_name:
             # New name set (no old name to migrate from)
-            self.command_history = all_history.get(new_name, [])
+            self.command_history = list(HISTORY.get(new_name, []))
         else:
             # Name cleared
             self.command_history = []
 
+        self.load_history_completion()
         self.connection_name = new_name
         self.tab_label.set_text(new_name if new_name else f"Connection {self.tab_number}")
         self.history_index = -1
-        # Refresh dropdown for all tabs to show updated names
+        # Update dropdowns for all tabs with the added/removed names only
+        self.parent.update_connection_names()
         for tab in self.parent.tabs:
-            tab.populate_connection_names()
-            # Restore the current text after repopulating
-            tab.name_entry.set_text(tab.connection_name)
+            # Restore the current text if a removed entry cleared it
+            if tab.name_entry.get_text() != tab.connection_name:
+                tab.name_entry.set_text(tab.connection_name)
+
+    def load_history_completion(self):
+        """Fill the input completion model with the unique commands in history"""
+        self.history_store.clear()
+        self.history_completion_set = set(self.command_history)
+        for command in dict.fromkeys(self.command_history):
+            self.history_store.append([command])
 
     def save_command_to_history(self, command):
-        """Save a command to this connection's history and persist to disk"""
+        """Save a command to this connection's history and schedule a write to disk"""
         if not self.connection_name or not command.strip():
             return
         # Avoid consecutive duplicates
         if not self.command_history or self.command_history[-1] != command:
             self.command_history.append(command)
+        if command not in self.history_completion_set:
+            self.history_completion_set.add(command)
+            self.history_store.append([command])
         # Trim to max size, keeping the most recent commands
         if len(self.command_history) > MAX_HISTORY_PER_CONNECTION:
+            evicted = self.command_history[:-MAX_HISTORY_PER_CONNECTION]
             self.command_history = self.command_history[-MAX_HISTORY_PER_CONNECTION:]
-        # Persist
-        all_history = load_all_history()
-        all_history[self.connection_name] = self.command_history
-        save_all_history(all_history)
+            # Drop evicted commands from the completion unless still in history
+            for old_command in evicted:
+                if old_command in self.history_completion_set and old_command not in self.command_history:
+                    self.history_completion_set.discard(old_command)
+                    for row in self.history_store:
+                        if row[0] == old_command:
+                            self.history_store.remove(row.iter)
+                            break
+        # Persist (deferred)
+        HISTORY[self.connection_name] = self.command_history
+        schedule_history_save()
 
     def on_input_key_press(self, widget, event):
         """Handle Up/Down arrow keys for command history navigation"""
@@ -260,7 +394,7 @@ class SerialTab:
                 self.history_index -= 1
             widget.set_text(self.command_history[self.history_index])
             # Move cursor to end
-            GLib.idle_add(widget.set_position, -1)
+            widget.set_position(-1)
             return True  # Consume the event
 
         elif keyval == Gdk.KEY_Down:
@@ -273,32 +407,41 @@ class SerialTab:
                 # Went past the end, restore original typed text
                 self.history_index = -1
                 widget.set_text(self.current_input)
-            GLib.idle_add(widget.set_position, -1)
+            widget.set_position(-1)
             return True
 
         return False
 
-    def get_available_ports(self):
-        """Return filtered list of available serial ports"""
-        ports = serial.tools.list_ports.comports()
-        return sorted([port.device for port in ports if 'ttyS' not in port.device])
-
-    def refresh_ports(self):
-        """Refresh the list of available serial ports, preserving current selection"""
+    def refresh_ports(self, port_list=None):
+        """Refresh the list of available serial ports, preserving current selection.
+        Uses port_list if given, otherwise scans the system for ports."""
         if self.is_connected:
-            return  # Don't change dropdown while connected
+            # Don't change dropdown while connected; catch up on disconnect
+            if port_list is not None:
+                self.ports_stale = True
+            return
 
-        current = self.port_combo.get_active_text()
-        port_list = self.get_available_ports()
+        if port_list is None:
+            port_list = list_serial_ports()
+        self.ports_stale = False
 
-        self.port_combo.remove_all()
+        # Only remove/insert the ports that changed; the combo keeps its
+        # active row as long as that port is still present
+        available = set(port_list)
+        for index in range(len(self.combo_ports) - 1, -1, -1):
+            if self.combo_ports[index] not in available:
+                del self.combo_ports[index]
+                self.port_combo.remove(index)
+
+        listed = set(self.combo_ports)
         for port in port_list:
-            self.port_combo.append_text(port)
+            if port not in listed:
+                index = bisect.bisect_left(self.combo_ports, port)
+                self.combo_ports.insert(index, port)
+                self.port_combo.insert_text(index, port)
 
-        # Restore previous selection if still available
-        if current and current in port_list:
-            self.port_combo.set_active(port_list.index(current))
-        elif port_list:
+        # Fall back to the first port if the selected one went away
+        if self.port_combo.get_active() < 0 and self.combo_ports:
             self.port_combo.set_active(0)
 
     def toggle_connection(self):
@@ -325,7 +468,7 @@ class SerialTab:
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
-                timeout=1
+                timeout=None  # Reads block; disconnect() cancels them
             )
 
             self.is_connected = True
@@ -333,8 +476,8 @@ class SerialTab:
             self.status_label.set_markup("<span foreground='green'>Connected</span>")
             self.log_message(f"Connected to {port} at {baudrate} baud", "info")
 
-            # Start read thread
-            self.read_thread = threading.Thread(target=self.read_from_serial, daemon=True)
+            # Start read thread, bound to this port object
+            self.read_thread = threading.Thread(target=self.read_from_serial, args=(self.serial_port,), daemon=True)
             self.read_thread.start()
 
             # Disable port/baudrate selection
@@ -351,6 +494,16 @@ class SerialTab:
         self.is_connected = False
 
         if self.serial_port and self.serial_port.is_open:
+            # Wake the read thread out of its blocking read and let it exit
+            try:
+                self.serial_port.cancel_read()
+            except (AttributeError, serial.SerialException):
+                pass  # Backend without cancel support
+            if self.read_thread:
+                self.read_thread.join(timeout=0.1)
+                if self.read_thread.is_alive():
+                    # It exits once the port below is closed, and never touches a newer port
+                    self.log_message("Read thread still stopping; it will exit when the port closes", "info")
             self.serial_port.close()
 
         self.connect_btn.set_label("Connect")
@@ -361,21 +514,46 @@ class SerialTab:
         self.port_combo.set_sensitive(True)
         self.baudrate_combo.set_sensitive(True)
 
-    def read_from_serial(self):
-        """Thread function to read from serial port"""
-        while self.is_connected:
+        # Apply port changes that happened while connected
+        if self.ports_stale:
+            self.refresh_ports(port_list=self.parent.port_list)
+
+    def read_from_serial(self, port):
+        """Thread function to read from serial port.
+        Only reads from port and stops once it is no longer the tab's active port."""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while port is self.serial_port and self.is_connected:
             try:
-                if self.serial_port and self.serial_port.in_waiting > 0:
-                    data = self.serial_port.readline()
-                    try:
-                        text = data.decode('utf-8').strip()
-                        self.message_queue.put(("output", f"<< {text}\n"))
-                    except UnicodeDecodeError:
-                        text = f"[HEX] {data.hex()}"
-                        self.message_queue.put(("output", f"<< {text}\n"))
+                # Block in the driver until data arrives or the read is cancelled
+                data = port.read(1)
+                if not data:
+                    continue
+                # Let the rest of the burst arrive, then take it in one read
+                time.sleep(READ_AGGREGATE_DELAY)
+                waiting = min(port.in_waiting, READ_CHUNK_MAX - 1)
+                if waiting:
+                    data += port.read(waiting)
+                if port is not self.serial_port or not self.is_connected:
+                    break  # Disconnected (and maybe reconnected) meanwhile
+
+                held, _ = decoder.getstate()
+                text = decoder.decode(data)
+                if "\ufffd" in text:
+                    # Undecodable bytes: redo the chunk, including any bytes the
+                    # decoder was holding, so only the bad lines are hex-dumped
+                    decoder.reset()
+                    text = decode_with_hex_fallback(held + data, decoder)
+                text = text.replace("\r", "")
+                if not text:
+                    continue
+
+                # Line prefixes are added in process_queue, which knows where
+                # the console currently ends
+                self.message_queue.append(("output", text, False))
+                self._wake()
             except Exception as e:
-                if self.is_connected:
-                    self.message_queue.put(("error", f"Read error: {str(e)}\n"))
+                if port is self.serial_port and self.is_connected:
+                    self.log_message(f"Read error: {str(e)}", "error")
                 break
 
     def send_data(self):
@@ -384,13 +562,15 @@ class SerialTab:
             self.log_message("Not connected", "error")
             return
 
-        text = self.input_entry.get_text().upper()
+        text = self.input_entry.get_text()
+        if self.uppercase_check.get_active():
+            text = text.upper()
         if not text:
             return
 
         try:
             self.serial_port.write((text + '\n').encode('utf-8'))
-            self.log_message(f">> {text}\n", "input")
+            self.log_message(f">> {text}", "input")
             self.save_command_to_history(text)
             self.history_index = -1
             self.current_input = ""
@@ -399,29 +579,106 @@ class SerialTab:
             self.log_message(f"Send error: {str(e)}", "error")
 
     def log_message(self, message, tag="output"):
-        """Add message to console with specified color tag"""
-        self.message_queue.put((tag, message + "\n" if not message.endswith("\n") else message))
+        """Add a line to the console with specified color tag"""
+        # The newline is added when the batch is joined in process_queue
+        self.message_queue.append((tag, message, True))
+        self._wake()
+
+    def _wake(self):
+        """Signal the main loop that messages are waiting in the queue"""
+        wake_w = self._wake_w
+        if wake_w is None:
+            return  # Tab closed; a late reader thread must not write to a reused fd
+        try:
+            os.write(wake_w, b"x")
+        except (BlockingIOError, OSError):
+            pass  # Pipe already full (a wakeup is pending) or closed
 
-    def process_queue(self):
-        """Process messages from the queue and update console"""
+    def _on_wake(self, source, condition):
+        """Drain pending wakeup bytes and process the queue"""
         try:
-            while True:
-                tag, message = self.message_queue.get_nowait()
-                end_iter = self.text_buffer.get_end_iter()
-                self.text_buffer.insert_with_tags_by_name(end_iter, message, tag)
-
-                # Auto-scroll to bottom
-                mark = self.text_buffer.get_insert()
-                self.console.scroll_to_mark(mark, 0.0, True, 0.0, 1.0)
-        except queue.Empty:
+            os.read(self._wake_r, 4096)
+        except BlockingIOError:
             pass
+        self.process_queue()
+        return True  # Keep watching the pipe
 
-        return True  # Continue calling this function
+    def process_queue(self):
+        """Process messages from the queue and update console"""
+        messages = []
+        while self.message_queue:
+            messages.append(self.message_queue.popleft())
+
+        if not messages:
+            return
+
+        # Only follow new output if the view is already scrolled to the bottom
+        vadj = self.console.get_vadjustment()
+        was_at_bottom = vadj.get_value() + vadj.get_page_size() >= vadj.get_upper() - 2
+
+        # Coalesce consecutive messages with the same tag into a single insert.
+        # Logged lines are newline-joined, raw serial chunks are concatenated
+        # and get a "<< " prefix on every line they start.
+        runs = []
+        for tag, message, is_line in messages:
+            key = (tag, is_line)
+            if runs and runs[-1][0] == key:
+                runs[-1][1].append(message)
+            else:
+                runs.append((key, [message]))
+
+        self.text_buffer.begin_user_action()
+        end_iter = self.text_buffer.get_iter_at_mark(self._end_mark)
+        for (tag, is_line), parts in runs:
+            at_line_start = end_iter.starts_line()
+            if is_line:
+                text = "\n".join(parts) + "\n"
+                if not at_line_start:
+                    # Keep logged lines off a partial serial line (e.g. a prompt)
+                    text = "\n" + text
+            else:
+                text = "".join(parts)
+                ends_with_newline = text.endswith("\n")
+                if ends_with_newline:
+                    text = text[:-1]
+                text = text.replace("\n", "\n<< ")
+                if at_line_start:
+                    text = "<< " + text
+                if ends_with_newline:
+                    text += "\n"
+            # The iter is revalidated to the end of each inserted run
+            self.text_buffer.insert_with_tags_by_name(end_iter, text, tag)
+
+        # Trim the oldest lines so the buffer stays bounded
+        line_count = self.text_buffer.get_line_count()
+        if line_count > MAX_CONSOLE_LINES:
+            start_iter = self.text_buffer.get_start_iter()
+            trim_iter = self.text_buffer.get_iter_at_line(line_count - MAX_CONSOLE_LINES)
+            self.text_buffer.delete(start_iter, trim_iter)
+        self.text_buffer.end_user_action()
+
+        # Auto-scroll to bottom once layout has caught up
+        if was_at_bottom and not self._scroll_pending:
+            self._scroll_pending = True
+            GLib.idle_add(self.scroll_to_end)
+
+    def scroll_to_end(self):
+        """Scroll the console to the last line"""
+        self._scroll_pending = False
+        self.console.scroll_to_mark(self._end_mark, 0.0, True, 0.0, 1.0)
+        return False  # One-shot idle callback
 
     def clear_console(self):
         """Clear the console"""
         self.text_buffer.set_text("")
 
+    def close(self):
+        """Release the wakeup pipe and its main loop watch"""
+        GLib.source_remove(self._wake_source)
+        wake_w, self._wake_w = self._wake_w, None
+        os.close(self._wake_r)
+        os.close(wake_w)
+
 
 class SerialGUI(Gtk.Window):
     """Main GUI application"""
@@ -449,8 +706,12 @@ class SerialGUI(Gtk.Window):
         self.tabs = []
         self.tab_counter = 1
 
+        # Sorted connection names shown in every tab's name dropdown
+        self.connection_names = sorted(HISTORY.keys())
+
         # Track known ports for auto-detection
-        self.known_ports = set()
+        self.known_ports = frozenset()
+        self.port_list = ()  # Sorted result of the last scan, shared by all tabs
 
         # Create first tab
         self.add_tab()
@@ -476,24 +737,45 @@ class SerialGUI(Gtk.Window):
 
     def auto_detect_ports(self):
         """Periodically check for new/removed USB ports and refresh all tabs"""
-        ports = serial.tools.list_ports.comports()
-        current_ports = set(p.device for p in ports if 'ttyS' not in p.device)
+        port_list = list_serial_ports()
 
-        if current_ports != self.known_ports:
+        if port_list != self.port_list:
+            self.port_list = port_list
+            current_ports = frozenset(port_list)
             added = current_ports - self.known_ports
             removed = self.known_ports - current_ports
             self.known_ports = current_ports
 
-            # Log and refresh all disconnected tabs
+            # Log and refresh all tabs; connected tabs defer until disconnect
             for tab in self.tabs:
                 if added:
                     tab.log_message(f"USB port(s) detected: {', '.join(sorted(added))}", "info")
                 if removed:
                     tab.log_message(f"USB port(s) removed: {', '.join(sorted(removed))}", "info")
-                tab.refresh_ports()
+                tab.refresh_ports(port_list=self.port_list)
 
         return True  # Keep the timer running
 
+    def update_connection_names(self):
+        """Apply history name additions/removals to every tab's name dropdown"""
+        # Every tab is updated, including those whose popup is closed: the
+        # diff is only a few row inserts/removals, and deferring it would
+        # leave stale names in the combo's model until the popup is opened
+        current = set(HISTORY)
+        known = set(self.connection_names)
+
+        for name in known - current:
+            index = bisect.bisect_left(self.connection_names, name)
+            del self.connection_names[index]
+            for tab in self.tabs:
+                tab.name_combo.remove(index)
+
+        for name in sorted(current - known):
+            index = bisect.bisect_left(self.connection_names, name)
+            self.connection_names.insert(index, name)
+            for tab in self.tabs:
+                tab.name_combo.insert_text(index, name)
+
     def add_tab(self):
         """Add a new serial connection tab"""
         tab = SerialTab(self.notebook, self.tab_counter, self)
@@ -516,6 +798,7 @@ class SerialGUI(Gtk.Window):
         # Remove tab
         self.notebook.remove_page(current_index)
         self.tabs.pop(current_index)
+        tab.close()
 
     def on_closing(self, widget, event):
         """Cleanup and close all connections before exiting"""
@@ -524,6 +807,9 @@ class SerialGUI(Gtk.Window):
             if tab.is_connected:
                 tab.disconnect()
 
+        # Write any pending history changes
+        flush_history()
+
         Gtk.main_quit()
         return False
 